@@ -1,16 +1,20 @@
-from collections.abc import Sequence
+from collections.abc import Iterable
+import copy
 # from dataclasses import dataclass, field
+import functools
 import math
+import os
 from pathlib import Path
-from pprint import pprint
-import shutil
-from typing import Any, cast, Optional, Self, TypedDict
+from types import MappingProxyType
+from typing import (Any, cast, NotRequired, Optional, Self, TYPE_CHECKING,
+                    TypedDict)
 import warnings
 
-from ruamel.yaml import YAML
-
 import mkhexgrid_wrapper as mw
 
+if TYPE_CHECKING:
+    from ruamel.yaml import YAML
+
 
 SQRT3 = math.sqrt(3)
 INTERSECTION_CENTER = 0
@@ -27,6 +31,7 @@ HP_IMAGE_ACROSS = 'image_across'
 HP_LONG = 'length_long'
 HP_LONG_DIVS = 'divisions_long'
 HP_MASK_BACKGROUND = 'ffaaaa'
+HP_PARALLEL = 'parallel'
 HP_X = 'x'
 HP_Y = 'y'
 HP_COORD_FORMAT_AS_MKHEXGRID = 'coord_format_as_mkhexgrid'
@@ -53,7 +58,12 @@ MHG_R = 'r'
 MHG_ROWS = 'rows'
 YAML_LOADER_SAFE = 'safe'
 LIST_OF_DICTS_INDEX_KEY = 'name'    # Not used but needed by copied code
+MISSING = object()
 defaults = Path('hex_defaults.yml')
+loaded_yamls: dict[tuple[str, str],
+                   tuple[tuple[int, int], dict[Any, Any]]] = {}
+merged_yamls: dict[tuple[tuple[str, ...], str],
+                   tuple[tuple[tuple[int, int], ...], dict[Any, Any]]] = {}
 
 
 class IncompleteHexDimensionsGivenError(mw.BaseError):
@@ -96,6 +106,7 @@ class GridMakerGeneralParams(TypedDict):
     """General parameters for the GridMaker."""
     tool: str
     show_output: bool
+    parallel: NotRequired[bool]
 
 
 class BorderBoxParams(TypedDict):
@@ -140,15 +151,28 @@ class GridMakerSettings(TypedDict):
 
 class Base(object):
     """Base class with more informative __repr__."""
+    __slots__ = ()
 
     def __repr__(self) -> str:
         """Object representation."""
-        params = (f'{key}={repr(self.__dict__[key])}' for key in self.__dict__)
-        return f'{repr(self.__class__)}({", ".join(params)})'
+        params = ', '.join(f'{key}={value!r}'
+                           for key, value in self.get_attributes().items())
+        return f'{type(self).__name__}({params})'
+
+    def get_attributes(self) -> dict[str, Any]:
+        """Get attributes set on object, whether in slots or __dict__."""
+        attributes = {key: getattr(self, key)
+                      for cls in reversed(type(self).__mro__)
+                      for key in vars(cls).get('__slots__', ())
+                      if hasattr(self, key)}
+        attributes.update(getattr(self, '__dict__', {}))
+        return attributes
 
 
 class SettingsHandler(Base):
     """Handle settings for producing pages."""
+    __slots__ = ('grid_maker_general', 'fixed', 'variable',
+                 'subprocess_kwargs', 'hexpage', 'icopage')
 
     def __init__(self,
                  grid_maker_general: GridMakerGeneralParams,
@@ -169,11 +193,9 @@ class SettingsHandler(Base):
     def check_tool(self) -> None:
         """Check that object can use mkhexgrid."""
         # tool_not_found = False
-        try:
-            _ = self.grid_maker_general[HP_TOOL]
-        except KeyError:
-            self.grid_maker_general[HP_TOOL] = mw.TOOL
-        if shutil.which(self.grid_maker_general[HP_TOOL]) is None:
+        self.grid_maker_general.setdefault(HP_TOOL, mw.TOOL)
+        if mw.which(self.grid_maker_general[HP_TOOL],
+                    os.environ.get('PATH')) is None:
             raise ProgramNotFoundError(mw.TOOL)
 
     @classmethod
@@ -186,13 +208,25 @@ class SettingsHandler(Base):
     def from_yamls_or_dicts(cls: type[Self],
                             dicts_or_files: list[str | Path | dict[Any, Any]],
                             typ: str = YAML_LOADER_SAFE) -> Self:
-        """Fill class instance from list of yaml paths or dicts."""
-        merger = DictMerger([get_dict_from_file(yaml_dict)
-                             for yaml_dict in dicts_or_files])
-        settings = merger.merge_all()
+        """Fill class instance from list of yaml paths or dicts.
+
+        When only yaml paths are given, the merged settings are reused
+        until one of the files changes.
+        """
+        if any(isinstance(yaml_dict, dict) for yaml_dict in dicts_or_files):
+            settings = merge_dicts_or_files(dicts_or_files, typ)
+        else:
+            settings = merge_yamls(cast(list[str | Path], dicts_or_files),
+                                   typ)
         return cls(**cast(GridMakerSettings, settings))
 
 
+def clear_yaml_cache() -> None:
+    """Forget all loaded and merged yaml files."""
+    loaded_yamls.clear()
+    merged_yamls.clear()
+
+
 def get_dict_from_file(dict_or_file: str | Path | dict[Any, Any],
                        typ: str = YAML_LOADER_SAFE) -> dict[Any, Any]:
     """Get list of loaded yaml files or passed-through dicts."""
@@ -201,6 +235,33 @@ def get_dict_from_file(dict_or_file: str | Path | dict[Any, Any],
     return dict_or_file
 
 
+def merge_dicts_or_files(dicts_or_files: list[str | Path | dict[Any, Any]],
+                         typ: str = YAML_LOADER_SAFE) -> dict[Any, Any]:
+    """Merge yaml files and dicts, later ones updating earlier ones."""
+    merger = DictMerger.from_iterable(get_dict_from_file(yaml_dict, typ)
+                                      for yaml_dict in dicts_or_files)
+    return merger.merged
+
+
+def merge_yamls(docs: list[str | Path],
+                typ: str = YAML_LOADER_SAFE) -> dict[Any, Any]:
+    """Merge yaml files, reusing the result while they are unchanged.
+
+    Only the last merge of each list of files is kept, replaced once
+    any of the files changes.
+    """
+    file_keys = [get_file_key(doc) for doc in docs]
+    paths = tuple(path for path, _ in file_keys)
+    stamps = tuple(stamp for _, stamp in file_keys)
+    cached = merged_yamls.get((paths, typ))
+    if cached is not None and cached[0] == stamps:
+        merged = cached[1]
+    else:
+        merged = merge_dicts_or_files(list(docs), typ)
+        merged_yamls[(paths, typ)] = (stamps, merged)
+    return copy.deepcopy(merged)
+
+
 class GridGrainOrienter(Base):
     """Adjusts mkhexgrid parameters based on grid_grain setting.
 
@@ -231,22 +292,25 @@ class GridGrainOrienter(Base):
               grain grid. X is always side-to-side and Y is always up-
               and-down.
     """
-    by_grain = {mw.GRID_GRAIN_HORIZONTAL: {HP_ACROSS: MHG_HEX_WIDTH,
-                                           HP_ACROSS_DIVS: MHG_COLUMNS,
-                                           HP_LONG: MHG_HEX_HEIGHT,
-                                           HP_LONG_DIVS: MHG_ROWS,
-                                           HP_IMAGE_ACROSS: MHG_IMAGE_HEIGHT,
-                                           HP_IMAGE_LONG: MHG_IMAGE_WIDTH,
-                                           HP_X: MHG_R,
-                                           HP_Y: MHG_C},
-                mw.GRID_GRAIN_VERTICAL: {HP_ACROSS: MHG_HEX_HEIGHT,
-                                         HP_ACROSS_DIVS: MHG_ROWS,
-                                         HP_LONG: MHG_HEX_WIDTH,
-                                         HP_LONG_DIVS: MHG_COLUMNS,
-                                         HP_IMAGE_ACROSS: MHG_IMAGE_WIDTH,
-                                         HP_IMAGE_LONG: MHG_IMAGE_HEIGHT,
-                                         HP_X: MHG_C,
-                                         HP_Y: MHG_R}}
+    by_grain = MappingProxyType({
+        mw.GRID_GRAIN_HORIZONTAL: MappingProxyType({
+            HP_ACROSS: MHG_HEX_WIDTH,
+            HP_ACROSS_DIVS: MHG_COLUMNS,
+            HP_LONG: MHG_HEX_HEIGHT,
+            HP_LONG_DIVS: MHG_ROWS,
+            HP_IMAGE_ACROSS: MHG_IMAGE_HEIGHT,
+            HP_IMAGE_LONG: MHG_IMAGE_WIDTH,
+            HP_X: MHG_R,
+            HP_Y: MHG_C}),
+        mw.GRID_GRAIN_VERTICAL: MappingProxyType({
+            HP_ACROSS: MHG_HEX_HEIGHT,
+            HP_ACROSS_DIVS: MHG_ROWS,
+            HP_LONG: MHG_HEX_WIDTH,
+            HP_LONG_DIVS: MHG_COLUMNS,
+            HP_IMAGE_ACROSS: MHG_IMAGE_WIDTH,
+            HP_IMAGE_LONG: MHG_IMAGE_HEIGHT,
+            HP_X: MHG_C,
+            HP_Y: MHG_R})})
 
     def __init__(self, grid_grain: str,  # coord_format: str,
                  coords_fixed_to_grain: bool) -> None:
@@ -256,17 +320,15 @@ class GridGrainOrienter(Base):
         self.axes = self.by_grain[grid_grain]
         self.x = self.get_coord(HP_X)
         self.y = self.get_coord(HP_Y)
+        self.coord_table = str.maketrans({HP_X: self.x, HP_Y: self.y,
+                                          HP_X.upper(): self.x.upper(),
+                                          HP_Y.upper(): self.y.upper()})
 
     def adjust_coord_format(self, coord_format: str | None) -> str | None:
         """Translate coord_format to send to mkhexgrid."""
         if coord_format is None:
             return coord_format
-        adjustments = {HP_X: self.x, HP_Y: self.y}
-        for key in adjustments.keys():
-            coord_format = coord_format.replace(key, adjustments[key])
-            coord_format = coord_format.replace(key.upper(),
-                                                adjustments[key].upper())
-        return coord_format
+        return coord_format.translate(self.coord_table)
 
     def get_coord(self, coord: str) -> str:
         """Get character to send to mkhexgrid for coordinate."""
@@ -310,6 +372,8 @@ class GridMaker(Base):
         """Initialize object."""
         self.settings = settings
         self.results = []
+        self.grid_grain = self.get_grid_grain()
+        self.suffix = self.get_suffix()
 
     def check_page_settings(self, page_type: str) -> tuple[bool, bool]:
         """Check that enough setings are given to calculate the rest."""
@@ -332,22 +396,15 @@ class GridMaker(Base):
                      orienter: GridGrainOrienter,
                      coord_format_as_mkhexgrid: bool) -> None:
         """Use orienter to modify coord_format setting, if needed."""
-        if not coord_format_as_mkhexgrid:
-            try:
-                coord_format = settings[MHG_COORD_FORMAT]
-            except KeyError:
-                pass
-            else:
-                adjusted = orienter.adjust_coord_format(coord_format)
-                settings[MHG_COORD_FORMAT] = adjusted
+        if not coord_format_as_mkhexgrid and MHG_COORD_FORMAT in settings:
+            adjusted = orienter.adjust_coord_format(settings[MHG_COORD_FORMAT])
+            settings[MHG_COORD_FORMAT] = adjusted
 
     def get_border_thickness(self, page_settings, planner) -> float:
         """Get grid_thickness setting from hexpage border_hex."""
         border_hex = page_settings[HP_BORDER_HEX]
-        try:
-            grid_thickness = border_hex[MHG_GRID_THICKNESS]
-        except KeyError:
-            grid_thickness = MHG_DEFAULT_GRID_THICKNESS
+        grid_thickness = border_hex.get(MHG_GRID_THICKNESS,
+                                        MHG_DEFAULT_GRID_THICKNESS)
         if planner.given == HP_LONG:
             grid_thickness *= (2 / SQRT3)
         return grid_thickness
@@ -357,106 +414,117 @@ class GridMaker(Base):
                           orienter: GridGrainOrienter,
                           div: int) -> mw.HexMakerParams:
         """Get settings calculated from those present."""
+        axes = orienter.axes
         calcs = {MHG_OUTFILE: self.name_outfile(page_settings[HP_DIR], div),
-                 orienter.axes[planner.given]:
-                 page_settings[planner.given] / div,
-                 orienter.axes[planner.given_divs]: div + 1,
-                 orienter.axes[planner.calc_divs]: planner.divs_calc_func(div)}
-        for setting in [HP_IMAGE_ACROSS, HP_IMAGE_LONG]:
-            try:
-                calcs.update({orienter.axes[setting]: page_settings[setting]})
-            except KeyError:
-                pass
+                 axes[planner.given]: page_settings[planner.given] / div,
+                 axes[planner.given_divs]: div + 1,
+                 axes[planner.calc_divs]: planner.divs_calc_func(div)}
+        for setting in (HP_IMAGE_ACROSS, HP_IMAGE_LONG):
+            if setting in page_settings:
+                calcs[axes[setting]] = page_settings[setting]
         return cast(mw.HexMakerParams, calcs)
 
+    def get_grid(self, div_settings: mw.HexMakerParams) -> mw.MkHexGrid:
+        """Get wrapper for one grid destined for hexpage or icopage.
+
+        The output directory is made here, before any grids are run, so
+        that grids run at the same time don't race to make it.
+        """
+        run_settings = cast(mw.HexMakerParams,
+                            {**self.settings.fixed, **div_settings})
+        out_dir = Path(run_settings[MHG_OUTFILE]).parent  # type: ignore
+        out_dir.mkdir(parents=True, exist_ok=True)
+        return mw.MkHexGrid(run_settings,
+                            tool=self.settings.grid_maker_general[HP_TOOL])
+
     def get_grid_grain(self) -> str:
         """Get grid_grain value."""
-        try:
-            return_value = self.settings.fixed[MHG_GRID_GRAIN]
-        except KeyError:
-            return_value = MHG_DEFAULT_GRID_GRAIN
-        return return_value
+        return self.settings.fixed.get(MHG_GRID_GRAIN, MHG_DEFAULT_GRID_GRAIN)
 
     def get_suffix(self) -> str:
         """Get file extension for desired output format."""
-        try:
-            suffix = self.settings.fixed[MHG_OUTPUT]
-        except KeyError:
-            suffix = MHG_DEFAULT_OUTPUT
-        return suffix
+        return self.settings.fixed.get(MHG_OUTPUT, MHG_DEFAULT_OUTPUT)
+
+    def make_grids(self, page_type: str) -> None:
+        """Make grid svgs for all divisions."""
+        self.run_grids(self.plan_grids(page_type))
+        if self.settings.grid_maker_general[HP_SHOW_OUTPUT]:
+            print('\n'.join(map(repr, self.results)))
+
+    def make_hexpage_grids(self) -> None:
+        """Make grid svgs for use in hexpages."""
+        self.make_grids(HP_HEXPAGE)
 
-    def make_border_hex(self, page_settings: MapSettings,
+    def make_icopage_grids(self) -> None:
+        """Make grid svgs for use in icopages."""
+        self.make_grids(HP_ICOPAGE)
+
+    def name_outfile(self, out_dir: str, div: int) -> str:
+        """Get path of file to which to write output."""
+        return f'{out_dir}/div{div}.{self.suffix}'
+
+    def plan_border_hex(self, page_settings: MapSettings,
                         orienter: GridGrainOrienter, planner: PagePlanner,
-                        ) -> None:
-        """Make big hex border around hexpage."""
+                        ) -> mw.HexMakerParams:
+        """Get settings for big hex border around hexpage."""
         div_settings = {MHG_OUTFILE: (f'{page_settings[HP_DIR]}'
-                                      f'\\border.{self.get_suffix()}'),
+                                      f'\\border.{self.suffix}'),
                         orienter.axes[planner.given]:
                         page_settings[planner.given],
                         MHG_ROWS: 1, MHG_COLUMNS: 1}
         div_settings.update(page_settings[HP_BORDER_HEX])
-        self.make_one_grid(cast(mw.HexMakerParams, div_settings))
+        return cast(mw.HexMakerParams, div_settings)
 
-    def make_grids(self, page_type: str) -> None:
-        """Make grid svgs for all divisions."""
+    def plan_grids(self, page_type: str) -> list[mw.HexMakerParams]:
+        """Get settings for each grid to make for page type.
+
+        Nothing is run here, so the planned grids can be looked over
+        without calling mkhexgrid.
+        """
         planner = PagePlanner(page_type, self.check_page_settings(page_type))
         page_settings = getattr(self.settings, page_type)
-        orienter = GridGrainOrienter(self.get_grid_grain(),
+        orienter = GridGrainOrienter(self.grid_grain,
                                      page_settings[HP_COORDS_FIXED_TO_GRAIN])
+        plans = []
         for div in page_settings[planner.given_divs]:
-            try:
-                div_settings = self.settings.variable[div].copy()
-            except KeyError:
-                div_settings = cast(mw.HexMakerParams, {})
+            div_settings = cast(mw.HexMakerParams,
+                                self.settings.variable.get(div, {}).copy())
             div_settings.update(self.get_calc_settings(page_settings, planner,
                                                        orienter, div))
             self.format_coord(div_settings, orienter,
                               page_settings[HP_COORD_FORMAT_AS_MKHEXGRID])
-            self.make_one_grid(div_settings)
+            plans.append(div_settings)
         if page_type == HP_HEXPAGE:
-            self.make_border_hex(page_settings, orienter, planner)
-            self.make_mask_hex(page_settings, orienter, planner)
-        if self.settings.grid_maker_general[HP_SHOW_OUTPUT]:
-            pprint(self.results)
-
-    def make_hexpage_grids(self) -> None:
-        """Make grid svgs for use in hexpages."""
-        self.make_grids(HP_HEXPAGE)
-
-    def make_icopage_grids(self) -> None:
-        """Make grid svgs for use in icopages."""
-        self.make_grids(HP_ICOPAGE)
+            plans.append(self.plan_border_hex(page_settings, orienter,
+                                              planner))
+            plans.append(self.plan_mask_hex(page_settings, orienter, planner))
+        return plans
 
-    def make_mask_hex(self, page_settings: MapSettings,
+    def plan_mask_hex(self, page_settings: MapSettings,
                       orienter: GridGrainOrienter, planner: PagePlanner,
-                      ) -> None:
-        """Make start of mask for hexpage interior.
+                      ) -> mw.HexMakerParams:
+        """Get settings for start of mask for hexpage interior.
 
         This requires further tweaking elsewhere to remove the stroke
         and add the fill, but at least the size is calculated.
         """
         grid_thickness = self.get_border_thickness(page_settings, planner)
         div_settings = ({MHG_OUTFILE: (f'{page_settings[HP_DIR]}'
-                                       f'\\mask.{self.get_suffix()}'),
+                                       f'\\mask.{self.suffix}'),
                          orienter.axes[planner.given]:
                          page_settings[planner.given] - grid_thickness,
                          MHG_ROWS: 1, MHG_COLUMNS: 1})
-        self.make_one_grid(cast(mw.HexMakerParams, div_settings))
-
-    def make_one_grid(self, div_settings: mw.HexMakerParams) -> None:
-        """Make one grid destined for hexpage or icopage."""
-        run_settings = self.settings.fixed.copy()
-        run_settings.update(div_settings)
-        out_dir = Path(run_settings[MHG_OUTFILE]).parent  # type: ignore
-        if not out_dir.exists():
-            out_dir.mkdir(parents=True)
-        mhg = mw.MkHexGrid(run_settings,
-                           tool=self.settings.grid_maker_general[HP_TOOL])
-        self.results.append(mhg.run(self.settings.subprocess_kwargs))
-
-    def name_outfile(self, out_dir: str, div: int) -> str:
-        """Get path of file to which to write output."""
-        return f'{out_dir}/div{div}.{self.get_suffix()}'
+        return cast(mw.HexMakerParams, div_settings)
+
+    def run_grids(self, plans: list[mw.HexMakerParams]) -> None:
+        """Make planned grids, several at once unless parallel is False."""
+        grids = [self.get_grid(plan) for plan in plans]
+        subprocess_kwargs = self.settings.subprocess_kwargs
+        if self.settings.grid_maker_general.get(HP_PARALLEL, True):
+            self.results.extend(mw.MkHexGrid.run_many(grids,
+                                                      subprocess_kwargs))
+        else:
+            self.results.extend(mhg.run(subprocess_kwargs) for mhg in grids)
 
 
 class PageMaker(Base):
@@ -469,6 +537,7 @@ class PageMaker(Base):
 
 class DictMerger(Base):
     """Merge dicts, updating any nested dicts."""
+    __slots__ = ('merged', 'top_dicts', 'list_index_key')
 
     def __init__(self, top_dicts: list[dict[Any, Any]],
                  list_index_key: str = LIST_OF_DICTS_INDEX_KEY) -> None:
@@ -477,24 +546,27 @@ class DictMerger(Base):
         In this case, list_index_key isn't in use but was inherited from
         where these functions were developed.
         """
-        self.merged = top_dicts.pop(0)
-        self.top_dicts = top_dicts
+        self.merged = top_dicts[0]
+        self.top_dicts = top_dicts[1:]
         self.list_index_key = list_index_key
 
-    def get_dict_by_item(self, dicts: list[dict[Any, Any]],
-                         target: Any) -> dict[Any, Any] | None:
-        """Get dict from list where dict[key] == value."""
-        dict_found = False
-        return_dict = None
-        for list_dict in dicts:
-            for item_key, item_value in list_dict.items():
-                if item_key == self.list_index_key and item_value == target:
-                    return_dict = list_dict
-                    dict_found = True
-                    break
-            if dict_found:
-                break
-        return return_dict
+    @classmethod
+    def from_iterable(cls: type[Self], dicts: Iterable[dict[Any, Any]],
+                      list_index_key: str = LIST_OF_DICTS_INDEX_KEY) -> Self:
+        """Merge dicts into the first as each one is yielded.
+
+        Dicts can then come from a generator, each merged as soon as it
+        is loaded rather than after all have been.
+        """
+        iterator = iter(dicts)
+        first = next(iterator, MISSING)
+        if first is MISSING:
+            raise ValueError('At least one dict or yaml file is needed to '
+                             'merge.')
+        merger = cls([first], list_index_key)
+        for top_dict in iterator:
+            merger.update_by_key(merger.merged, top_dict)
+        return merger
 
     def merge_all(self) -> dict[Any, Any]:
         """Merge all dicts present."""
@@ -504,19 +576,37 @@ class DictMerger(Base):
 
     def update_by_key(self, update_to: dict[Any, Any],
                       update_from: dict[Any, Any]) -> None:
-        """Update nested dictionary from another key by key."""
-        for key, from_value in update_from.items():
-            try:
-                to_value = update_to[key]
-            except KeyError:
-                update_to.update({key: from_value})
-            else:
+        """Update nested dictionary from another key by key.
+
+        Nested dicts are worked through from a stack rather than by
+        recursion. Keys only in the dict updated from are copied over in
+        one update; only keys in both dicts are looked at one by one. An
+        empty dict given over a value that isn't a dict leaves it as is.
+        """
+        stack = [(update_to, update_from)]
+        while stack:
+            to_dict, from_dict = stack.pop()
+            overlap = to_dict.keys() & from_dict.keys()
+            if not overlap:
+                to_dict.update(from_dict)
+                continue
+            to_dict.update({key: from_value
+                            for key, from_value in from_dict.items()
+                            if key not in overlap})
+            for key in overlap:
+                to_value = to_dict[key]
+                from_value = from_dict[key]
                 if isinstance(from_value, dict):
-                    self.update_by_key(to_value, from_value)
+                    if isinstance(to_value, dict):
+                        stack.append((to_value, from_value))
+                    elif from_value:
+                        raise TypeError(
+                            f'Cannot merge dict into {type(to_value).__name__}'
+                            f' at key "{key}".')
                 elif is_list_or_tuple(from_value) and to_value is not None:
-                    update_to[key] = self.update_list(to_value, from_value)
+                    to_dict[key] = self.update_list(to_value, from_value)
                 else:
-                    update_to[key] = from_value
+                    to_dict[key] = from_value
 
     def update_list(self, update_tos: list[Any],
                     update_froms: list[Any]) -> list[Any] | None:
@@ -526,49 +616,80 @@ class DictMerger(Base):
         is desired. Yeah, more parameters should  be created for this,
         but not now.
         """
-        returns = None
-        if update_tos is not None and update_froms is not None:
-            update_tos.extend(update_froms)
-            returns = sorted(list(set(update_tos)))
-        return returns
+        if update_tos is None or update_froms is None:
+            return None
+        return sorted({*update_tos, *update_froms})
 
     def update_list_of_dicts(self, update_tos: list[dict[str, Any]],
                              update_froms: list[dict[str, Any]]) -> None:
-        """Update each dict in list from dict with matching key value."""
+        """Update each dict in list from dict with matching key value.
+
+        Dicts are found through an index built once from their key
+        values, the first dict with each value being the one updated.
+        """
+        index: dict[Any, dict[str, Any]] = {}
+        for item_to in update_tos:
+            if self.list_index_key in item_to:
+                index.setdefault(item_to[self.list_index_key], item_to)
         for item_from in update_froms:
-            try:
-                item_to = self.get_dict_by_item(update_tos,
-                                                item_from[self.list_index_key])
-            except KeyError:
-                item_to = None
+            target = item_from.get(self.list_index_key, MISSING)
+            item_to = None if target is MISSING else index.get(target)
             if item_to is not None:
                 self.update_by_key(item_to, item_from)
             else:
                 update_tos.append(item_from)
+                if target is not MISSING:
+                    index.setdefault(target, item_from)
 
 
 def dict_has_key(dict_to_check: dict[Any, Any], key: Any,
                  allow_none: bool = False) -> bool:
     """Check if key is present in dict."""
-    is_present = False
-    try:
-        check = dict_to_check[key]
-        if not allow_none and check is not None:
-            is_present = True
-    except KeyError:
-        pass
-    return is_present
+    check = dict_to_check.get(key, MISSING)
+    return check is not MISSING and (allow_none or check is not None)
 
 
 def is_list_or_tuple(variable: Any) -> bool:
-    """Check if variable is a list or tuple but not a string."""
-    return isinstance(variable, Sequence) and not isinstance(variable, str)
+    """Check if variable is a list or tuple."""
+    return isinstance(variable, (list, tuple))
+
+
+@functools.lru_cache
+def get_yaml_loader(typ: str = YAML_LOADER_SAFE) -> 'YAML':
+    """Get YAML loader, built once per loader type.
+
+    With ruamel.yaml.clib installed, the safe loader parses with the
+    libyaml C extension rather than ruamel's pure-Python parser.
+
+    ruamel.yaml is imported here rather than with the module since it
+    is slow to import and only needed once settings are loaded.
+    """
+    from ruamel.yaml import YAML
+    return YAML(typ=typ, pure=False)
+
+
+def get_file_key(doc: str | Path) -> tuple[str, tuple[int, int]]:
+    """Get resolved path of a file and a stamp of its current contents."""
+    path = Path(doc).resolve()
+    stat = path.stat()
+    return (str(path), (stat.st_mtime_ns, stat.st_size))
 
 
 def load_yaml(doc: str | Path, typ: str = YAML_LOADER_SAFE) -> dict[Any, Any]:
-    """Load yaml doc with ruamel.yaml."""
-    loader = YAML(typ=typ)
-    return loader.load(Path(doc))
+    """Load yaml doc with ruamel.yaml.
+
+    The last parse of each file is kept and reused until the file
+    changes, when it is replaced. Copies are returned since the
+    DictMerger updates the dicts it is given in place.
+    """
+    path, stamp = get_file_key(doc)
+    cached = loaded_yamls.get((path, typ))
+    if cached is not None and cached[0] == stamp:
+        loaded = cached[1]
+    else:
+        loaded = get_yaml_loader(typ).load(Path(doc))
+        loaded_yamls[(path, typ)] = (stamp, loaded)
+    return copy.deepcopy(loaded)
 
 
 def grid_intersection_type(division: int) -> int:
@@ -596,12 +717,12 @@ def hexes_across(hexes_long: int) -> int:
     """
     if grid_intersection_type(hexes_long) != INTERSECTION_OUTER:
         hexes_long += -1
-    return int(3 / 4 * hexes_long)
+    return 3 * hexes_long // 4
 
 
 def hexes_long(hexes_across: int) -> int:
     """Get subhexes to fill hex point to point given those across."""
-    return_value = int(4 / 3 * hexes_across)
+    return_value = 4 * hexes_across // 3
     if grid_intersection_type(hexes_across) != INTERSECTION_OUTER:
         return_value += 1
     return return_value
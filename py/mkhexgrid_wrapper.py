@@ -1,8 +1,13 @@
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import functools
+import os
 import re
 import subprocess
 from pathlib import Path
 import shutil
+import string
 from typing import Any, cast, Optional, Mapping, TypedDict
 
 
@@ -17,6 +22,7 @@ PS_UNIT_INCH = 'in'
 PS_UNIT_MILLIMETER = 'mm'
 PS_UNIT_POINT = 'pt'
 PS_UNITS = [PS_UNIT_INCH, PS_UNIT_MILLIMETER, PS_UNIT_POINT]
+PS_UNIT_SET = frozenset(PS_UNITS)
 GRID_START_IN = 'i'
 GRID_START_OUT = 'o'
 GRID_STARTS = [GRID_START_IN, GRID_START_OUT]
@@ -33,8 +39,15 @@ CENTER_STYLE_NONE = 'n'
 CENTER_STYLE_DOT = 'd'
 CENTER_STYLE_CROSS = 'c'
 CENTER_STYLES = [CENTER_STYLE_NONE, CENTER_STYLE_DOT, CENTER_STYLE_CROSS]
-hex_color_pattern = re.compile(r'(?i)^[0-9A-F]{6}$')
-coord_format_pattern = re.compile(r'^(?:.*%(?:t?[CR]|0?\d?[cr])){2}.*$')
+HEX_DIGITS = frozenset(string.hexdigits)
+coord_format_pattern = re.compile(r'%(?:t?[CR]|0?\d?[cr])', re.ASCII)
+coord_format_findall = coord_format_pattern.findall
+
+
+@functools.lru_cache(maxsize=32)
+def which(tool: str, path: str | None = None) -> str | None:
+    """Get path to tool, remembering results for each tool and PATH."""
+    return shutil.which(tool, path=path)
 
 
 class BaseError(Exception):
@@ -65,16 +78,20 @@ class ProgramNotFoundError(BaseError):
 class UnknownParameterError(BaseError):
     """Unknown error passed to MkHexGrid object."""
 
-    def __init__(self, argument: str, allowed_values: list[str]) -> None:
+    def __init__(self, argument: str, allowed_values: Iterable[str]
+                 ) -> None:
         super().__init__(argument)
         delim = ', '
         self.message = (f'An unknown parameter, "{argument}", was given to '
                         'the MkHexGrid object.\nAllowed parameters include the'
-                        f' following:\n{delim.join(sorted(allowed_values))}')
+                        f' following:\n{delim.join(allowed_values)}')
 
 
 class ParamBase():
     """Base class for parameter classes."""
+    needs_output_for_debug = False
+    takes_param_list = False
+    takes_value = True
 
     def __init__(self, param: str, value: Any, tool_arg: str = "") -> None:
         self.param = param
@@ -96,6 +113,7 @@ class ParamBase():
 
 class ParamFromList(ParamBase):
     """Base class for parameters within listed values."""
+    takes_param_list = True
 
     def __init__(self, param: str, value: str, tool_arg: str,
                  value_options: list[str]) -> None:
@@ -125,12 +143,12 @@ class ParamNumber(ParamBase):
                     ) -> tuple[bool, str]:
         """Check that value can be converted to float."""
         return_value = self.get_pass_result()
-        message = (f'The parameter, "{self.param}", has a value of '
-                   f'"{self.value}". A number is required.')
         value = self.get_value_numeric(output_obj)
         try:
             _ = float(value)
         except ValueError:
+            message = (f'The parameter, "{self.param}", has a value of '
+                       f'"{self.value}". A number is required.')
             return_value = (False, message)
         return return_value
 
@@ -138,31 +156,31 @@ class ParamNumber(ParamBase):
                   ) -> tuple[bool, str]:
         """Check that value can be converted to int."""
         return_value = self.get_pass_result()
-        message = (f'The parameter, "{self.param}", has a value of '
-                   f'"{self.value}". An integer is required.')
         value = self.get_value_numeric(output_obj)
-        try:
-            value_int = int(value)
-        except ValueError:
-            return_value = (False, message)
+        if isinstance(value, int):
+            check_passed = True
+        elif isinstance(value, float):
+            check_passed = value.is_integer()
         else:
-            if isinstance(value, float) and value != value_int:
-                return_value = (False, message)
+            try:
+                _ = int(value)
+            except ValueError:
+                check_passed = False
+            else:
+                check_passed = True
+        if not check_passed:
+            message = (f'The parameter, "{self.param}", has a value of '
+                       f'"{self.value}". An integer is required.')
+            return_value = (False, message)
         return return_value
 
     def get_value_numeric(self, output_obj: Optional[ParamFromList] = None
                           ) -> str | int | float:
         """Get numeric part of value without any unit present."""
         value = self.value
-        if output_obj is not None:
-            if output_obj.value == OUTPUT_PS:
-                try:
-                    unit = value[-2:]
-                except TypeError:
-                    pass
-                else:
-                    if unit in OUTPUTS:
-                        value = value[:-2]
+        if (output_obj is not None and output_obj.value == OUTPUT_PS
+           and isinstance(value, str) and value[-2:] in PS_UNIT_SET):
+            value = value[:-2]
         return value
 
 
@@ -215,40 +233,45 @@ class ParamAngle(ParamNumber):
 
 class ParamColor(ParamArgList):
     """Parameter for color, format differing by output type."""
+    needs_output_for_debug = True
 
     def debug(self, output_obj: ParamFromList) -> tuple[bool, str]:
         """Check that value is a string or three floats list color."""
         return_value = self.get_pass_result()
-        message = (f'The parameter, "{self.param}", has a value of '
-                   f'"{self.value}". Either a string like a hex color (without'
-                   ' the "#" at the front) for SVG and PNG output or a list of'
-                   'three numbers from 0 to 1 for PostScript output is '
-                   'required.')
         if isinstance(self.value, list):
             objects = [ParamNumber(self.param, value) for value in self.value]
             checks = [obj.debug_float(output_obj)[0] for obj in objects]
-            if (False in checks or len(checks) != 3
-               or False in [0 <= obj.value <= 1 for obj in objects]):
-                return_value = (False, message)
+            check_passed = not (
+                False in checks or len(checks) != 3
+                or False in [0 <= obj.value <= 1 for obj in objects])
         else:
-            if hex_color_pattern.match(self.value) is None:
-                return_value = (False, message)
+            check_passed = (isinstance(self.value, str)
+                            and len(self.value) == 6
+                            and HEX_DIGITS.issuperset(self.value))
+        if not check_passed:
+            message = (f'The parameter, "{self.param}", has a value of '
+                       f'"{self.value}". Either a string like a hex color '
+                       '(without the "#" at the front) for SVG and PNG output '
+                       'or a list of three numbers from 0 to 1 for PostScript '
+                       'output is required.')
+            return_value = (False, message)
         return return_value
 
 
 class ParamCoordFont(ParamString):
     """Parameter for coord font."""
+    needs_output_for_debug = True
 
     def debug(self, output_obj: ParamFromList) -> tuple[bool, str]:
         """Check for possible bug in PNG fonts."""
         # TODO: Add png file exists check if exe bug is not addressed.
         return_value = self.get_pass_result()
-        message = (f'The parameter, "{self.param}", has a value of '
-                   f'"{self.value}". A possible bug in mkhexgrid.exe may not '
-                   'find a font by name for PNG output. One must supply a link'
-                   ' to the font file instead, like '
-                   r'"C:\Windows\Fonts\consola.ttf".')
         if output_obj.value == OUTPUT_PNG:
+            message = (f'The parameter, "{self.param}", has a value of '
+                       f'"{self.value}". A possible bug in mkhexgrid.exe may '
+                       'not find a font by name for PNG output. One must '
+                       'supply a link to the font file instead, like '
+                       r'"C:\Windows\Fonts\consola.ttf".')
             return_value = (False, message)
         return return_value
 
@@ -257,20 +280,24 @@ class ParamCoordFormat(ParamBase):
     """Parameter for coord format with its own syntax."""
 
     def debug(self) -> tuple[bool, str]:
-        """Check that value can generate a coordinate."""
+        """Check that value can generate a coordinate.
+
+        An empty value passes since it just leaves coordinates off.
+        """
         return_value = self.get_pass_result()
-        message = (f'The parameter, "{self.param}", has a value of '
-                   f'"{self.value}". This did not generate a well-formed grid '
-                   'coordinate.\n    Basic numeral: "%c" or "%r"\n'
-                   '    Space-padded numeral: insert number like "%2c" or '
-                   '"%3r"\n'
-                   '    Zero-padded numneral: like "%02c" or "%03r"\n'
-                   '    Letter (AB after AA): "%C" or "%R"\n'
-                   '    Letter (BB after AA): "%tC" or "%tR"\n'
-                   'Other characters may go around those patterns. Column and '
-                   'row may be reversed with horizontal grid grain. See '
-                   f'{HELP_URL} for more information.')
-        if coord_format_pattern.match(self.value) is None:
+        if self.value and ('\n' in self.value
+                           or len(coord_format_findall(self.value)) < 2):
+            message = (f'The parameter, "{self.param}", has a value of '
+                       f'"{self.value}". This did not generate a well-formed '
+                       'grid coordinate.\n    Basic numeral: "%c" or "%r"\n'
+                       '    Space-padded numeral: insert number like "%2c" or '
+                       '"%3r"\n'
+                       '    Zero-padded numneral: like "%02c" or "%03r"\n'
+                       '    Letter (AB after AA): "%C" or "%R"\n'
+                       '    Letter (BB after AA): "%tC" or "%tR"\n'
+                       'Other characters may go around those patterns. Column '
+                       'and row may be reversed with horizontal grid grain. '
+                       f'See {HELP_URL} for more information.')
             return_value = (False, message)
         return return_value
 
@@ -281,20 +308,22 @@ class ParamCount(ParamBase):
     def debug(self) -> tuple[bool, str]:
         """Check that value can be converted to positive int."""
         return_value = self.get_pass_result()
-        message = (f'The parameter, "{self.param}", has a value of '
-                   f'"{self.value}". A positive integer is required.')
         try:
             value_int = int(self.value)
         except ValueError:
-            return_value = (False, message)
+            check_passed = False
         else:
-            if self.value != value_int or value_int <= 0:
-                return_value = (False, message)
+            check_passed = self.value == value_int and value_int > 0
+        if not check_passed:
+            message = (f'The parameter, "{self.param}", has a value of '
+                       f'"{self.value}". A positive integer is required.')
+            return_value = (False, message)
         return return_value
 
 
 class ParamFlag(ParamNoDebug):
     """Boolean parameter object."""
+    takes_value = False
 
     def __str__(self) -> str:
         """String used for parameter in subprocess call."""
@@ -311,6 +340,7 @@ class ParamInt(ParamNumber):
 
 class ParamLength(ParamNumber):
     """Parameter for length, format differing by output type."""
+    needs_output_for_debug = True
 
     def debug(self, output_obj: ParamFromList) -> tuple[bool, str]:
         """Check that value can be converted to float."""
@@ -319,27 +349,29 @@ class ParamLength(ParamNumber):
 
 class ParamMargin(ParamArgList, ParamNumber):
     """Parameter for margin with either one or four values."""
+    needs_output_for_debug = True
 
     def debug(self, output_obj: ParamFromList) -> tuple[bool, str]:
         """Check that value(s) can be converted to float."""
         return_value = self.get_pass_result()
-        message = (f'The parameter, "{self.param}", has a value of '
-                   f'"{self.value}". Either a number or a list of four numbers'
-                   ' is required.')
         if isinstance(self.value, list):
             objects = [ParamNumber(self.param, value) for value in self.value]
             checks = [obj.debug_float(output_obj)[0] for obj in objects]
-            if False in checks or len(checks) != 4:
-                return_value = (False, message)
+            check_passed = False not in checks and len(checks) == 4
         else:
             return_value = self.debug_float(output_obj)
-            if not return_value[0]:
-                return_value = (False, message)
+            check_passed = return_value[0]
+        if not check_passed:
+            message = (f'The parameter, "{self.param}", has a value of '
+                       f'"{self.value}". Either a number or a list of four '
+                       'numbers is required.')
+            return_value = (False, message)
         return return_value
 
 
 class ParamMisc(ParamNoDebug):
     """Boolean parameter object."""
+    takes_value = False
 
     def __str__(self) -> str:
         """String used for parameter in subprocess call."""
@@ -348,36 +380,38 @@ class ParamMisc(ParamNoDebug):
 
 class ParamOpacity(ParamNumber):
     """Parameter for opacity, format differing by output type."""
+    needs_output_for_debug = True
 
     def debug(self, output_obj: ParamFromList) -> tuple[bool, str]:
         """Check that value is the right type in the right range."""
         return_value = self.get_pass_result()
-        message = (f'The parameter, "{self.param}", has a value of '
-                   f'"{self.value}". ')
         check_passed = False
         if output_obj.value == OUTPUT_PNG:
-            message += ('For png output, an integer in the range of 0 to 127 '
-                        'is required.')
+            requirement = ('For png output, an integer in the range of 0 to '
+                           '127 is required.')
             check = self.debug_int()
             if check[0]:
                 if 0 <= self.value <= 127:
                     check_passed = True
-        if output_obj.value == OUTPUT_SVG:
-            message += ('For svg output, a number in the range of 0 to 1 '
-                        'is required.')
+        elif output_obj.value == OUTPUT_SVG:
+            requirement = ('For svg output, a number in the range of 0 to 1 '
+                           'is required.')
             check = self.debug_float()
             if check[0]:
                 if 0 <= self.value <= 1:
                     check_passed = True
         else:
-            message += ('For PostScript output, this parameter is ignored.')
+            requirement = 'For PostScript output, this parameter is ignored.'
         if not check_passed:
+            message = (f'The parameter, "{self.param}", has a value of '
+                       f'"{self.value}". {requirement}')
             return_value = (False, message)
         return return_value
 
 
 class ParamSize(ParamNumber):
     """Parameter for size, format differing by output, PNG is int."""
+    needs_output_for_debug = True
 
     def debug(self, output_obj: ParamFromList) -> tuple[bool, str]:
         """Check for valid value by output."""
@@ -505,17 +539,21 @@ class MkHexGrid():
                   'matte': ParamInfo('--matte', ParamFlag),
                   'help': ParamInfo('--help', ParamMisc),
                   'version': ParamInfo('--version', ParamMisc)}
+    param_names = tuple(sorted(param_data))
 
     def __init__(self, params: HexMakerParams, tool: str = TOOL,
                  debug: bool = False) -> None:
         """Initialize object."""
-        if shutil.which(tool) is None:
+        tool_path = which(tool, os.environ.get('PATH'))
+        if tool_path is None:
             raise ProgramNotFoundError(tool, type(self).__name__)
-        self.tool = tool
-        self.params = [self.get_param(param, value)
-                       for param, value in params.items()
-                       if value not in [None, False]]
-        self.tool_args = [self.tool, *[str(param) for param in self.params]]
+        self.tool = tool_path
+        given_params = (self.get_param(param, value)
+                        for param, value in params.items()
+                        if value is not None and value is not False)
+        self.params = [param for param in given_params
+                       if param.takes_value or param.value]
+        self.params_by_name = {param.param: param for param in self.params}
 
     def __str__(self) -> str:
         """Get string from which tool can be run."""
@@ -526,19 +564,15 @@ class MkHexGrid():
         returns = []
         output = self.get_output_param()
         for param in self.params:
-            try:
-                returns.append(param.debug())
-            except TypeError:
+            if param.needs_output_for_debug:
                 returns.append(param.debug(output))
+            else:
+                returns.append(param.debug())
         return returns
 
     def get_output_param(self) -> type[ParamBase]:
         """Get output param."""
-        return_obj = None
-        for param in self.params:
-            if param.param == OUTPUT:
-                return_obj = param
-                break
+        return_obj = self.params_by_name.get(OUTPUT)
         if return_obj is None:
             return_obj = self.get_param(OUTPUT, OUTPUT_PNG)
         return return_obj
@@ -548,11 +582,11 @@ class MkHexGrid():
         try:
             info = self.param_data[param]
         except KeyError:
-            raise UnknownParameterError(param, list(self.param_data.keys()))
-        try:
+            raise UnknownParameterError(param, self.param_names)
+        if info.param_object.takes_param_list:
             return_obj = info.param_object(param, value, info.tool_arg,
                                            info.param_list)
-        except TypeError:
+        else:
             return_obj = info.param_object(param, value, info.tool_arg)
         return return_obj
 
@@ -563,3 +597,25 @@ class MkHexGrid():
         return subprocess.run(self.tool_args,
                               **cast(dict[str, Any], subprocess_kwargs))
         # return subprocess.run(str(self), **subprocess_kwargs)
+
+    @staticmethod
+    def run_many(grids: Iterable['MkHexGrid'],
+                 subprocess_kwargs: Optional[SubprocessKwargs] = None,
+                 max_workers: Optional[int] = None
+                 ) -> list[subprocess.CompletedProcess[Any]]:
+        """Make several hex grids at once, returning results in order.
+
+        Each grid is made by its own mkhexgrid process, so threads are
+        enough to keep several running while this one waits. By default,
+        no more run at once than there are CPUs.
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda grid: grid.run(subprocess_kwargs),
+                                     grids))
+
+    @functools.cached_property
+    def tool_args(self) -> list[str]:
+        """Get arguments for running tool, built once when first used."""
+        return [self.tool, *[str(param) for param in self.params]]